@@ -13,6 +13,7 @@ from telegram.constants import ParseMode
 from telegram.error import BadRequest, TelegramError
 from telegram.ext import (
     AIORateLimiter,
+    Application,
     ApplicationBuilder,
     CallbackQueryHandler,
     CommandHandler,
@@ -290,6 +291,12 @@ def build_storage() -> AbstractStorage:
     return InMemoryStorage()
 
 
+async def flush_storage(application: Application) -> None:
+    service = application.bot_data.get("service")
+    if service is not None:
+        service.storage.flush()
+
+
 def build_crypto_client() -> CryptoPayClient | None:
     token = os.environ.get("CRYPTOPAY_TOKEN")
     if not token:
@@ -320,9 +327,11 @@ def sync_user_profile(update: Update, service: ChannelEconomyService) -> None:
 
 
 def ensure_dependencies(context: ContextTypes.DEFAULT_TYPE) -> None:
-    service = context.application.bot_data.setdefault("service", build_service())
+    service = get_service(context)
     service.apply_settings(service.get_settings())
-    context.application.bot_data.setdefault("crypto", build_crypto_client())
+    bot_data = context.application.bot_data
+    if "crypto" not in bot_data:
+        bot_data["crypto"] = build_crypto_client()
 
 
 def is_admin_id(user_id: int | None, context: ContextTypes.DEFAULT_TYPE | None = None) -> bool:
@@ -813,7 +822,11 @@ async def send_main_menu(
 
 
 def get_service(context: ContextTypes.DEFAULT_TYPE) -> ChannelEconomyService:
-    return context.application.bot_data.setdefault("service", build_service())
+    bot_data = context.application.bot_data
+    # Build the service only once: each build opens its own storage.
+    if "service" not in bot_data:
+        bot_data["service"] = build_service()
+    return bot_data["service"]
 
 
 def get_crypto_client(context: ContextTypes.DEFAULT_TYPE) -> CryptoPayClient | None:
@@ -2906,6 +2919,7 @@ def main() -> None:
         ApplicationBuilder()
         .token(token)
         .rate_limiter(AIORateLimiter())
+        .post_shutdown(flush_storage)
         .build()
     )
 
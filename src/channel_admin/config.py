@@ -52,8 +52,8 @@ class PricingConfig:
 class FilterConfig:
     """Configures content filtering for posts."""
 
-    banned_words: set[str] = field(
-        default_factory=lambda: {
+    banned_words: frozenset[str] = frozenset(
+        {
             "хуй",
             "пизда",
             "вагина",
@@ -2,23 +2,37 @@
 
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass
 from typing import Iterable
 
 
+_TOKEN_PUNCTUATION = ".,!?\"'\n\r\t "
+
+
+@functools.lru_cache(maxsize=32)
+def _normalize_words(words: frozenset[str]) -> frozenset[str]:
+    return frozenset(word.lower() for word in words)
+
+
 @dataclass(slots=True)
 class WordFilter:
     """Simple word-based post filter."""
 
-    banned_words: set[str]
+    banned_words: frozenset[str]
 
     @classmethod
     def from_iterable(cls, words: Iterable[str]) -> "WordFilter":
-        return cls({word.lower() for word in words})
+        # Filters built from the same frozen word list share one normalized set.
+        if not isinstance(words, frozenset):
+            words = frozenset(words)
+        return cls(_normalize_words(words))
 
     def is_allowed(self, text: str) -> bool:
-        words = {token.strip(".,!?\"'\n\r\t ").lower() for token in text.split()}
-        return not any(word in words for word in self.banned_words)
+        # One pass over the tokens with O(1) lookups into the banned set,
+        # stopping at the first hit.
+        tokens = (token.strip(_TOKEN_PUNCTUATION) for token in text.lower().split())
+        return self.banned_words.isdisjoint(tokens)
 
     def assert_allowed(self, text: str) -> None:
         if not self.is_allowed(text):
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -22,6 +22,14 @@ class User:
     username: str | None = None
     full_name: str | None = None
 
+    def __copy__(self) -> "User":
+        # Golden cards are immutable, so only the containers need copying.
+        return replace(
+            self,
+            golden_cards=list(self.golden_cards),
+            referred_users=set(self.referred_users),
+        )
+
     def add_energy(self, amount: int) -> None:
         if amount < 0:
             raise ValueError("Cannot add negative energy")
@@ -60,8 +68,11 @@ class Post:
     photo_file_id: Optional[str] = None
     parse_mode: Optional[str] = None
 
+    def __copy__(self) -> "Post":
+        return replace(self)
 
-@dataclass(slots=True)
+
+@dataclass(frozen=True, slots=True)
 class GoldenCard:
     duration: timedelta
     purchased_at: datetime = field(default_factory=utcnow)
@@ -70,6 +81,12 @@ class GoldenCard:
     def expires_at(self) -> datetime:
         return self.purchased_at + self.duration
 
+    def __copy__(self) -> "GoldenCard":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "GoldenCard":
+        return self
+
 
 @dataclass(slots=True)
 class Invoice:
@@ -87,8 +104,11 @@ class Invoice:
     energy_amount: Optional[int] = None
     golden_hours: Optional[int] = None
 
+    def __copy__(self) -> "Invoice":
+        return replace(self)
 
-@dataclass(slots=True)
+
+@dataclass(frozen=True, slots=True)
 class TicketMessage:
     message_id: int
     ticket_id: int
@@ -96,6 +116,12 @@ class TicketMessage:
     text: str
     created_at: datetime = field(default_factory=utcnow)
 
+    def __copy__(self) -> "TicketMessage":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "TicketMessage":
+        return self
+
 
 @dataclass(slots=True)
 class Ticket:
@@ -107,6 +133,10 @@ class Ticket:
     updated_at: datetime = field(default_factory=utcnow)
     messages: list[TicketMessage] = field(default_factory=list)
 
+    def __copy__(self) -> "Ticket":
+        # Ticket messages are immutable, so only the list needs copying.
+        return replace(self, messages=list(self.messages))
+
     def add_message(self, message: TicketMessage) -> None:
         self.messages.append(message)
         self.updated_at = message.created_at
@@ -114,15 +144,39 @@ class Ticket:
             preview = message.text.strip()
             self.subject = preview[:80] if preview else None
 
+    def add_messages(self, messages: list[TicketMessage]) -> None:
+        """Append messages in bulk; equivalent to calling add_message for each."""
 
-@dataclass(slots=True)
+        if not messages:
+            return
+        self.messages.extend(messages)
+        self.updated_at = messages[-1].created_at
+        if self.subject:
+            return
+        for message in messages:
+            if message.sender == "user":
+                preview = message.text.strip()
+                self.subject = preview[:80] if preview else None
+                if self.subject:
+                    break
+
+
+@dataclass(frozen=True, slots=True)
 class BotSettings:
+    """Bot-wide configuration; update it with :func:`dataclasses.replace`."""
+
     autopost_paused: bool = False
     post_energy_cost: int = 20
     energy_price_per_unit: float = 1.0
     subscription_chat_id: str | None = None
     subscription_invite_link: str | None = None
 
+    def __copy__(self) -> "BotSettings":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "BotSettings":
+        return self
+
 
 @dataclass(slots=True)
 class UserboxProfile:
@@ -130,7 +184,7 @@ class UserboxProfile:
 
     full_name: str | None = None
     birth_date: str | None = None
-    phone_numbers: list[str] = field(default_factory=list)
+    phone_numbers: tuple[str, ...] = ()
     address: str | None = None
 
 
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import math
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import timedelta
 from typing import Dict, Iterable, Optional, Sequence
 
@@ -250,19 +250,36 @@ class ChannelEconomyService:
             raise ValueError("Пользователь заблокирован")
         return self.storage.create_ticket(user_id, text)
 
-    def add_ticket_message(
-        self, ticket_id: int, sender: str, message: str
-    ) -> Ticket:
+    @staticmethod
+    def _clean_ticket_message(sender: str, message: str) -> str:
         text = (message or "").strip()
         if not text:
             raise ValueError("Сообщение не должно быть пустым")
         if sender not in {"user", "admin"}:
             raise ValueError("Недопустимый отправитель")
+        return text
+
+    def add_ticket_message(
+        self, ticket_id: int, sender: str, message: str
+    ) -> Ticket:
+        text = self._clean_ticket_message(sender, message)
         ticket = self.storage.add_ticket_message(ticket_id, sender, text)
         if ticket is None:
             raise ValueError("Тикет не найден")
         return ticket
 
+    def add_ticket_messages(
+        self, ticket_id: int, messages: Iterable[tuple[str, str]]
+    ) -> Ticket:
+        prepared = [
+            (sender, self._clean_ticket_message(sender, message))
+            for sender, message in messages
+        ]
+        ticket = self.storage.bulk_add_messages(ticket_id, prepared)
+        if ticket is None:
+            raise ValueError("Тикет не найден")
+        return ticket
+
     def get_ticket(self, ticket_id: int) -> Ticket | None:
         return self.storage.get_ticket(ticket_id)
 
@@ -299,8 +316,7 @@ class ChannelEconomyService:
         return ticket
 
     def set_autopost_paused(self, paused: bool) -> None:
-        settings = self.storage.get_settings()
-        settings.autopost_paused = paused
+        settings = replace(self.storage.get_settings(), autopost_paused=paused)
         self.storage.save_settings(settings)
 
     def is_autopost_paused(self) -> bool:
@@ -391,8 +407,7 @@ class ChannelEconomyService:
     def update_post_price(self, cost: int) -> BotSettings:
         if cost <= 0:
             raise ValueError("Стоимость поста должна быть положительной")
-        settings = self.storage.get_settings()
-        settings.post_energy_cost = cost
+        settings = replace(self.storage.get_settings(), post_energy_cost=cost)
         self.storage.save_settings(settings)
         self.apply_settings(settings)
         return settings
@@ -469,8 +484,7 @@ class ChannelEconomyService:
     def update_energy_price(self, price: float) -> BotSettings:
         if price <= 0:
             raise ValueError("Цена за энергию должна быть положительной")
-        settings = self.storage.get_settings()
-        settings.energy_price_per_unit = price
+        settings = replace(self.storage.get_settings(), energy_price_per_unit=price)
         self.storage.save_settings(settings)
         self.apply_settings(settings)
         return settings
@@ -478,9 +492,11 @@ class ChannelEconomyService:
     def update_subscription_requirement(
         self, chat_id: str | None, invite_link: str | None
     ) -> BotSettings:
-        settings = self.storage.get_settings()
-        settings.subscription_chat_id = chat_id
-        settings.subscription_invite_link = invite_link
+        settings = replace(
+            self.storage.get_settings(),
+            subscription_chat_id=chat_id,
+            subscription_invite_link=invite_link,
+        )
         self.storage.save_settings(settings)
         self.apply_settings(settings)
         return settings
@@ -524,16 +540,16 @@ class ChimeraService:
         profile = UserboxProfile(
             full_name=full_name.strip() if isinstance(full_name, str) else None,
             birth_date=birth_date.strip() if isinstance(birth_date, str) else None,
-            phone_numbers=[
-                phone.strip()
-                for phone in (phone_numbers or [])
-                if isinstance(phone, str) and phone.strip()
-            ],
+            phone_numbers=tuple(
+                stripped
+                for phone in (phone_numbers or ())
+                if isinstance(phone, str) and (stripped := phone.strip())
+            ),
             address=address.strip() if isinstance(address, str) else None,
         )
         record.userbox_profile = profile
         self.storage.save_chimera_record(record)
-        refreshed = self.storage.get_chimera_record(record.record_id or record_id)
+        refreshed = self.storage.get_chimera_record(record_id)
         return refreshed or record
 
     def get_record(self, record_id: int) -> ChimeraRecord | None:
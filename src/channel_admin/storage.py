@@ -2,13 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
 import contextlib
+import functools
 import json
 import logging
-from copy import deepcopy
+import os
+import sys
+import threading
+import weakref
+from bisect import bisect_left, insort
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import copy, deepcopy
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+try:  # pragma: no cover - optional speedup
+    import orjson
+except ImportError:  # pragma: no cover - fallback to the standard library
+    orjson = None
 
 from .models import (
     BotSettings,
@@ -25,23 +41,74 @@ from .models import (
 
 LOGGER = logging.getLogger(__name__)
 
+DEFAULT_FLUSH_DELAY_SECONDS = 0.05
+DEFAULT_COMPACT_THRESHOLD = 1000
+DEFAULT_COMPACT_RATIO = 4
+
+_CREATED_AT_KEY = attrgetter("created_at")
+_EPOCH_UTC = datetime.fromtimestamp(0, tz=timezone.utc)
+_JOURNAL_OPEN_FLAGS = (
+    os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+)
 
-def _datetime_to_iso(value: datetime | None) -> str | None:
-    if value is None:
-        return None
-    return value.isoformat()
+
+def _json_default(value: object) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(payload: object) -> bytes:
+    # Serializers leave datetimes as-is: orjson renders them natively in the
+    # same ISO 8601 form ``datetime.isoformat`` produces for the fallback.
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        payload, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
+
+def _fsync_directory(path: Path) -> None:
+    """Flush a directory entry so a preceding rename survives a crash."""
+
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(fd)
+    except OSError:  # pragma: no cover - not supported by every filesystem
+        pass
+    finally:
+        os.close(fd)
+
+
+def _loads(data: bytes) -> dict:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value)
 
 
 def _iso_to_datetime(value: str | None) -> datetime | None:
     if not value:
         return None
     try:
-        return datetime.fromisoformat(value)
-    except ValueError:
+        return _parse_iso_datetime(value)
+    except (TypeError, ValueError):
         LOGGER.warning("Failed to parse datetime value %r", value)
         return None
 
 
+def _intern_optional(value: object) -> object:
+    # Enum-like fields repeat a handful of values across every record.
+    return sys.intern(value) if type(value) is str else value
+
+
 def _timedelta_to_seconds(value: timedelta | None) -> float | None:
     if value is None:
         return None
@@ -60,6 +127,8 @@ def _seconds_to_timedelta(value: float | int | None) -> timedelta | None:
 
 
 def _safe_int(value: object, default: int = 0) -> int:
+    if type(value) is int:
+        return value
     try:
         return int(value)
     except (TypeError, ValueError):
@@ -70,6 +139,8 @@ def _safe_int(value: object, default: int = 0) -> int:
 def _safe_optional_int(value: object | None) -> int | None:
     if value is None:
         return None
+    if type(value) is int:
+        return value
     try:
         return int(value)
     except (TypeError, ValueError):
@@ -78,6 +149,8 @@ def _safe_optional_int(value: object | None) -> int | None:
 
 
 def _safe_float(value: object, default: float = 0.0) -> float:
+    if type(value) is float:
+        return value
     try:
         return float(value)
     except (TypeError, ValueError):
@@ -88,7 +161,7 @@ def _safe_float(value: object, default: float = 0.0) -> float:
 def _serialize_golden_card(card: GoldenCard) -> dict:
     return {
         "duration_seconds": _timedelta_to_seconds(card.duration),
-        "purchased_at": _datetime_to_iso(card.purchased_at),
+        "purchased_at": card.purchased_at,
     }
 
 
@@ -104,14 +177,9 @@ def _deserialize_golden_card(payload: dict) -> GoldenCard | None:
 
 def _serialize_user(user: User) -> dict:
     return {
-        "user_id": user.user_id,
         "energy": user.energy,
-        "golden_cards": [
-            payload
-            for card in user.golden_cards
-            if (payload := _serialize_golden_card(card))
-        ],
-        "referred_users": sorted(user.referred_users),
+        "golden_cards": [_serialize_golden_card(card) for card in user.golden_cards],
+        "referred_users": list(user.referred_users),
         "is_banned": user.is_banned,
         "is_admin": user.is_admin,
         "username": user.username,
@@ -119,22 +187,28 @@ def _serialize_user(user: User) -> dict:
     }
 
 
-def _deserialize_user(payload: dict) -> User:
+def _deserialize_user(payload: dict, user_id: int | None = None) -> User:
     golden_cards: list[GoldenCard] = []
     for raw_card in payload.get("golden_cards", []):
         card = _deserialize_golden_card(raw_card)
         if card is not None:
             golden_cards.append(card)
 
-    referred_users: set[int] = set()
-    for raw_user_id in payload.get("referred_users", []):
-        try:
-            referred_users.add(int(raw_user_id))
-        except (TypeError, ValueError):
-            LOGGER.warning("Skipping invalid referred user id %r", raw_user_id)
+    raw_referred_users = payload.get("referred_users", [])
+    # Ids are written as JSON integers, so the set can usually be built in
+    # one step; only hand-edited or legacy values need per-item parsing.
+    if all(type(raw_user_id) is int for raw_user_id in raw_referred_users):
+        referred_users = set(raw_referred_users)
+    else:
+        referred_users = set()
+        for raw_user_id in raw_referred_users:
+            try:
+                referred_users.add(int(raw_user_id))
+            except (TypeError, ValueError):
+                LOGGER.warning("Skipping invalid referred user id %r", raw_user_id)
 
     return User(
-        user_id=_safe_int(payload.get("user_id", 0)),
+        user_id=user_id if user_id is not None else _safe_int(payload.get("user_id", 0)),
         energy=_safe_int(payload.get("energy", 0)),
         golden_cards=golden_cards,
         referred_users=referred_users,
@@ -147,11 +221,10 @@ def _deserialize_user(payload: dict) -> User:
 
 def _serialize_post(post: Post) -> dict:
     return {
-        "post_id": post.post_id,
         "user_id": post.user_id,
         "text": post.text,
         "requires_pin": post.requires_pin,
-        "created_at": _datetime_to_iso(post.created_at),
+        "created_at": post.created_at,
         "status": post.status,
         "channel_message_id": post.channel_message_id,
         "chat_message_id": post.chat_message_id,
@@ -162,27 +235,25 @@ def _serialize_post(post: Post) -> dict:
     }
 
 
-def _deserialize_post(payload: dict) -> Post:
+def _deserialize_post(payload: dict, post_id: int | None = None) -> Post:
     return Post(
-        post_id=_safe_optional_int(payload.get("post_id")),
+        post_id=post_id if post_id is not None else _safe_optional_int(payload.get("post_id")),
         user_id=_safe_int(payload.get("user_id", 0)),
         text=str(payload.get("text") or ""),
         requires_pin=bool(payload.get("requires_pin", False)),
-        created_at=_iso_to_datetime(payload.get("created_at"))
-        or datetime.fromtimestamp(0, tz=timezone.utc),
-        status=str(payload.get("status") or "pending"),
+        created_at=_iso_to_datetime(payload.get("created_at")) or _EPOCH_UTC,
+        status=sys.intern(str(payload.get("status") or "pending")),
         channel_message_id=_safe_optional_int(payload.get("channel_message_id")),
         chat_message_id=_safe_optional_int(payload.get("chat_message_id")),
         button_text=payload.get("button_text"),
         button_url=payload.get("button_url"),
         photo_file_id=payload.get("photo_file_id"),
-        parse_mode=payload.get("parse_mode"),
+        parse_mode=_intern_optional(payload.get("parse_mode")),
     )
 
 
 def _serialize_invoice(invoice: Invoice) -> dict:
     return {
-        "invoice_id": invoice.invoice_id,
         "user_id": invoice.user_id,
         "invoice_type": invoice.invoice_type,
         "amount": invoice.amount,
@@ -190,26 +261,29 @@ def _serialize_invoice(invoice: Invoice) -> dict:
         "pay_url": invoice.pay_url,
         "price": invoice.price,
         "status": invoice.status,
-        "created_at": _datetime_to_iso(invoice.created_at),
-        "paid_at": _datetime_to_iso(invoice.paid_at),
+        "created_at": invoice.created_at,
+        "paid_at": invoice.paid_at,
         "payload": invoice.payload,
         "energy_amount": invoice.energy_amount,
         "golden_hours": invoice.golden_hours,
     }
 
 
-def _deserialize_invoice(payload: dict) -> Invoice:
+def _deserialize_invoice(payload: dict, invoice_id: int | None = None) -> Invoice:
     return Invoice(
-        invoice_id=_safe_int(payload.get("invoice_id", 0)),
+        invoice_id=(
+            invoice_id
+            if invoice_id is not None
+            else _safe_int(payload.get("invoice_id", 0))
+        ),
         user_id=_safe_int(payload.get("user_id", 0)),
-        invoice_type=str(payload.get("invoice_type") or ""),
+        invoice_type=sys.intern(str(payload.get("invoice_type") or "")),
         amount=_safe_float(payload.get("amount", 0.0)),
-        asset=str(payload.get("asset") or ""),
+        asset=sys.intern(str(payload.get("asset") or "")),
         pay_url=str(payload.get("pay_url") or ""),
         price=_safe_float(payload.get("price", 0.0)),
-        status=str(payload.get("status") or "pending"),
-        created_at=_iso_to_datetime(payload.get("created_at"))
-        or datetime.fromtimestamp(0, tz=timezone.utc),
+        status=sys.intern(str(payload.get("status") or "pending")),
+        created_at=_iso_to_datetime(payload.get("created_at")) or _EPOCH_UTC,
         paid_at=_iso_to_datetime(payload.get("paid_at")),
         payload=payload.get("payload"),
         energy_amount=_safe_optional_int(payload.get("energy_amount")),
@@ -220,59 +294,66 @@ def _deserialize_invoice(payload: dict) -> Invoice:
 def _serialize_ticket_message(message: TicketMessage) -> dict:
     return {
         "message_id": message.message_id,
-        "ticket_id": message.ticket_id,
         "sender": message.sender,
         "text": message.text,
-        "created_at": _datetime_to_iso(message.created_at),
+        "created_at": message.created_at,
     }
 
 
-def _deserialize_ticket_message(payload: dict) -> TicketMessage:
+def _deserialize_ticket_message(
+    payload: dict, ticket_id: int | None = None
+) -> TicketMessage:
     return TicketMessage(
         message_id=_safe_int(payload.get("message_id", 0)),
-        ticket_id=_safe_int(payload.get("ticket_id", 0)),
-        sender=str(payload.get("sender") or "user"),
+        ticket_id=(
+            ticket_id if ticket_id is not None else _safe_int(payload.get("ticket_id", 0))
+        ),
+        sender=sys.intern(str(payload.get("sender") or "user")),
         text=str(payload.get("text") or ""),
-        created_at=_iso_to_datetime(payload.get("created_at"))
-        or datetime.fromtimestamp(0, tz=timezone.utc),
+        created_at=_iso_to_datetime(payload.get("created_at")) or _EPOCH_UTC,
     )
 
 
 def _serialize_ticket(ticket: Ticket) -> dict:
     return {
-        "ticket_id": ticket.ticket_id,
         "user_id": ticket.user_id,
         "status": ticket.status,
         "subject": ticket.subject,
-        "created_at": _datetime_to_iso(ticket.created_at),
-        "updated_at": _datetime_to_iso(ticket.updated_at),
+        "created_at": ticket.created_at,
+        "updated_at": ticket.updated_at,
         "messages": [
             _serialize_ticket_message(message) for message in ticket.messages
         ],
     }
 
 
-def _deserialize_ticket(payload: dict) -> Ticket:
+def _deserialize_ticket(payload: dict, ticket_id: int | None = None) -> Ticket:
     ticket = Ticket(
-        ticket_id=_safe_int(payload.get("ticket_id", 0)),
+        ticket_id=(
+            ticket_id if ticket_id is not None else _safe_int(payload.get("ticket_id", 0))
+        ),
         user_id=_safe_int(payload.get("user_id", 0)),
-        status=str(payload.get("status") or "open"),
+        status=sys.intern(str(payload.get("status") or "open")),
         subject=payload.get("subject"),
-        created_at=_iso_to_datetime(payload.get("created_at"))
-        or datetime.fromtimestamp(0, tz=timezone.utc),
-        updated_at=_iso_to_datetime(payload.get("updated_at"))
-        or datetime.fromtimestamp(0, tz=timezone.utc),
+        created_at=_iso_to_datetime(payload.get("created_at")) or _EPOCH_UTC,
+        updated_at=_iso_to_datetime(payload.get("updated_at")) or _EPOCH_UTC,
     )
     messages: list[TicketMessage] = []
     for raw in payload.get("messages", []):
         try:
-            message = _deserialize_ticket_message(raw)
+            message = _deserialize_ticket_message(raw, ticket.ticket_id)
         except Exception:  # pragma: no cover - defensive
             LOGGER.warning("Skipping malformed ticket message payload: %r", raw)
             continue
         messages.append(message)
-    for message in sorted(messages, key=lambda msg: msg.created_at):
-        ticket.add_message(message)
+    # Messages are written in order, so sorting is only needed for files
+    # edited by hand or produced by older versions.
+    if any(
+        later.created_at < earlier.created_at
+        for earlier, later in zip(messages, messages[1:])
+    ):
+        messages.sort(key=_CREATED_AT_KEY)
+    ticket.add_messages(messages)
     return ticket
 
 
@@ -310,7 +391,7 @@ def _serialize_userbox_profile(profile: UserboxProfile | None) -> dict | None:
     return {
         "full_name": profile.full_name,
         "birth_date": profile.birth_date,
-        "phone_numbers": list(profile.phone_numbers),
+        "phone_numbers": profile.phone_numbers,
         "address": profile.address,
     }
 
@@ -318,12 +399,11 @@ def _serialize_userbox_profile(profile: UserboxProfile | None) -> dict | None:
 def _deserialize_userbox_profile(payload: dict | None) -> UserboxProfile | None:
     if not payload:
         return None
-    phone_numbers: list[str] = []
-    for value in payload.get("phone_numbers", []):
-        if isinstance(value, str):
-            stripped = value.strip()
-            if stripped:
-                phone_numbers.append(stripped)
+    phone_numbers = tuple(
+        stripped
+        for value in payload.get("phone_numbers", [])
+        if isinstance(value, str) and (stripped := value.strip())
+    )
     return UserboxProfile(
         full_name=payload.get("full_name"),
         birth_date=payload.get("birth_date"),
@@ -334,33 +414,137 @@ def _deserialize_userbox_profile(payload: dict | None) -> UserboxProfile | None:
 
 def _serialize_chimera_record(record: ChimeraRecord) -> dict:
     return {
-        "record_id": record.record_id,
         "address_query": record.address_query,
-        "raw_results": deepcopy(record.raw_results),
-        "created_at": _datetime_to_iso(record.created_at),
+        "raw_results": record.raw_results,
+        "created_at": record.created_at,
         "userbox_profile": _serialize_userbox_profile(record.userbox_profile),
     }
 
 
-def _deserialize_chimera_record(payload: dict) -> ChimeraRecord:
+def _deserialize_chimera_record(
+    payload: dict, record_id: int | None = None
+) -> ChimeraRecord:
     raw_results = payload.get("raw_results")
     if not isinstance(raw_results, list):
         raw_results = []
-    normalized_results: list[dict[str, object]] = []
-    for item in raw_results:
-        if isinstance(item, dict):
-            normalized_results.append(dict(item))
+    # Freshly decoded dicts are not shared with anything, so keep them as-is.
+    normalized_results = [item for item in raw_results if isinstance(item, dict)]
     profile = _deserialize_userbox_profile(payload.get("userbox_profile"))
     return ChimeraRecord(
-        record_id=_safe_optional_int(payload.get("record_id")),
+        record_id=(
+            record_id
+            if record_id is not None
+            else _safe_optional_int(payload.get("record_id"))
+        ),
         address_query=str(payload.get("address_query") or ""),
         raw_results=normalized_results,
-        created_at=_iso_to_datetime(payload.get("created_at"))
-        or datetime.fromtimestamp(0, tz=timezone.utc),
+        created_at=_iso_to_datetime(payload.get("created_at")) or _EPOCH_UTC,
         userbox_profile=profile,
     )
 
 
+_post_order_key = attrgetter("created_at", "post_id")
+_invoice_order_key = attrgetter("created_at", "invoice_id")
+_ticket_order_key = attrgetter("updated_at", "ticket_id")
+
+
+def _sorted_discard(entries: list, entry: tuple) -> None:
+    position = bisect_left(entries, entry)
+    if position < len(entries) and entries[position] == entry:
+        del entries[position]
+
+
+def _index_add(index: dict, key: object, entry: tuple) -> None:
+    insort(index.setdefault(key, []), entry)
+
+
+def _index_discard(index: dict, key: object, entry: tuple) -> None:
+    entries = index.get(key)
+    if entries is None:
+        return
+    _sorted_discard(entries, entry)
+    if not entries:
+        del index[key]
+
+
+_SECTION_ATTRIBUTES = {
+    "users": "_users",
+    "posts": "_posts",
+    "invoices": "_invoices",
+    "tickets": "_tickets",
+    "chimera_records": "_chimera_records",
+}
+
+_SECTION_SERIALIZERS = {
+    "users": _serialize_user,
+    "posts": _serialize_post,
+    "invoices": _serialize_invoice,
+    "tickets": _serialize_ticket,
+    "chimera_records": _serialize_chimera_record,
+}
+
+
+def _noop() -> None:
+    return None
+
+
+def _log_write_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        LOGGER.error("Failed to write storage data: %s", future.exception())
+
+
+# Storages still open at exit. A weak set keeps the single exit hook from
+# pinning discarded instances.
+_OPEN_STORAGES: weakref.WeakSet[JsonStorage] = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_storages() -> None:
+    for storage in list(_OPEN_STORAGES):
+        # One failing storage must not keep the others from flushing.
+        try:
+            storage.close()
+        except Exception:
+            LOGGER.exception("Failed to close storage %s", storage._path)
+
+
+def _iter_json_chunks(
+    sections: dict, encode_record: Callable[[str, int, object], bytes | None]
+) -> Iterator[bytes]:
+    """Encode ``sections`` as one JSON object, a record at a time.
+
+    Writing the chunks as they are produced avoids building the whole
+    encoded document in memory before it is written.
+    """
+
+    yield b"{"
+    for index, (name, value) in enumerate(sections.items()):
+        yield (b"," if index else b"") + _dumps(name) + b":"
+        if name not in _SECTION_SERIALIZERS:
+            yield _dumps(_serialize_settings(value) if name == "settings" else value)
+            continue
+        yield b"{"
+        separator = b""
+        for key, record in value.items():
+            encoded = encode_record(name, key, record)
+            if encoded is None:
+                continue
+            yield b'%s"%d":%s' % (separator, key, encoded)
+            separator = b","
+        yield b"}"
+    yield b"}"
+
+
+@dataclass(slots=True)
+class _WriteJob:
+    """Records captured on the caller's thread, encoded by the writer."""
+
+    snapshot: bool
+    sections: dict
+    sequences: dict[str, int]
+    pending: set[tuple[str, int | None]] = field(default_factory=set)
+
+
 class AbstractStorage:
     """Interface for persisting users and posts."""
 
@@ -437,6 +621,11 @@ class AbstractStorage:
     ) -> Optional[Ticket]:
         raise NotImplementedError
 
+    def bulk_add_messages(
+        self, ticket_id: int, messages: Iterable[tuple[str, str]]
+    ) -> Optional[Ticket]:
+        raise NotImplementedError
+
     def add_chimera_record(self, record: ChimeraRecord) -> None:
         raise NotImplementedError
 
@@ -449,9 +638,21 @@ class AbstractStorage:
     def list_chimera_records(self) -> Iterable[ChimeraRecord]:
         raise NotImplementedError
 
+    def flush(self) -> None:
+        raise NotImplementedError
+
 
 class InMemoryStorage(AbstractStorage):
-    """Simple dictionary-based storage for demos and tests."""
+    """Simple dictionary-based storage for demos and tests.
+
+    Records are copied on the way in and out so callers never share state
+    with the store. Listing methods snapshot the matching records when
+    called and return an iterator that copies each one as it is consumed,
+    so callers that stop early do not pay for the rest. The models
+    implement ``__copy__`` to duplicate only their mutable containers;
+    golden cards and ticket messages are immutable and shared between
+    copies.
+    """
 
     def __init__(self) -> None:
         self._users: Dict[int, User] = {}
@@ -464,79 +665,145 @@ class InMemoryStorage(AbstractStorage):
         self._ticket_message_sequence: int = 1
         self._chimera_records: Dict[int, ChimeraRecord] = {}
         self._chimera_sequence: int = 1
+        # Ordered views hold ``(sort value, record id)`` pairs kept sorted with
+        # bisect, so listings never need to re-sort the records.
+        self._post_order: list[tuple[datetime, int]] = []
+        self._posts_by_status: Dict[str, list[tuple[datetime, int]]] = {}
+        self._posts_by_user: Dict[int, list[tuple[datetime, int]]] = {}
+        self._invoices_by_user: Dict[int, list[tuple[datetime, int]]] = {}
+        self._ticket_order: list[tuple[datetime, int]] = []
+        self._tickets_by_status: Dict[str, list[tuple[datetime, int]]] = {}
+        self._tickets_by_user: Dict[int, list[tuple[datetime, int]]] = {}
+
+    def reset(self) -> None:
+        """Drop every record and restart the id sequences."""
+
+        InMemoryStorage.__init__(self)
+
+    # Secondary indexes ---------------------------------------------------
+
+    def _store_post(self, post: Post) -> None:
+        previous = self._posts.get(post.post_id)
+        if previous is not None:
+            entry = _post_order_key(previous)
+            _sorted_discard(self._post_order, entry)
+            _index_discard(self._posts_by_status, previous.status, entry)
+            _index_discard(self._posts_by_user, previous.user_id, entry)
+        self._posts[post.post_id] = post
+        entry = _post_order_key(post)
+        insort(self._post_order, entry)
+        _index_add(self._posts_by_status, post.status, entry)
+        _index_add(self._posts_by_user, post.user_id, entry)
+
+    def _store_invoice(self, invoice: Invoice) -> None:
+        previous = self._invoices.get(invoice.invoice_id)
+        if previous is not None:
+            _index_discard(
+                self._invoices_by_user, previous.user_id, _invoice_order_key(previous)
+            )
+        self._invoices[invoice.invoice_id] = invoice
+        _index_add(self._invoices_by_user, invoice.user_id, _invoice_order_key(invoice))
+
+    def _store_ticket(self, ticket: Ticket) -> None:
+        previous = self._tickets.get(ticket.ticket_id)
+        if previous is not None:
+            entry = _ticket_order_key(previous)
+            _sorted_discard(self._ticket_order, entry)
+            _index_discard(self._tickets_by_status, previous.status, entry)
+            _index_discard(self._tickets_by_user, previous.user_id, entry)
+        self._tickets[ticket.ticket_id] = ticket
+        entry = _ticket_order_key(ticket)
+        insort(self._ticket_order, entry)
+        _index_add(self._tickets_by_status, ticket.status, entry)
+        _index_add(self._tickets_by_user, ticket.user_id, entry)
+
+    def _rebuild_indexes(self) -> None:
+        self._post_order = sorted(map(_post_order_key, self._posts.values()))
+        self._posts_by_status = {}
+        self._posts_by_user = {}
+        for entry in self._post_order:
+            post = self._posts[entry[1]]
+            self._posts_by_status.setdefault(post.status, []).append(entry)
+            self._posts_by_user.setdefault(post.user_id, []).append(entry)
+        self._invoices_by_user = {}
+        for entry in sorted(map(_invoice_order_key, self._invoices.values())):
+            invoice = self._invoices[entry[1]]
+            self._invoices_by_user.setdefault(invoice.user_id, []).append(entry)
+        self._ticket_order = sorted(map(_ticket_order_key, self._tickets.values()))
+        self._tickets_by_status = {}
+        self._tickets_by_user = {}
+        for entry in self._ticket_order:
+            ticket = self._tickets[entry[1]]
+            self._tickets_by_status.setdefault(ticket.status, []).append(entry)
+            self._tickets_by_user.setdefault(ticket.user_id, []).append(entry)
+
+    # AbstractStorage implementation -------------------------------------
 
     def get_user(self, user_id: int) -> Optional[User]:
         user = self._users.get(user_id)
         if user is None:
             return None
-        return deepcopy(user)
+        return copy(user)
 
     def save_user(self, user: User) -> None:
-        self._users[user.user_id] = deepcopy(user)
+        self._users[user.user_id] = copy(user)
 
     def list_users(self) -> Iterable[User]:
-        return [deepcopy(user) for user in self._users.values()]
+        return map(copy, list(self._users.values()))
 
     def add_post(self, post: Post) -> None:
         if post.post_id is None:
             post.post_id = self._post_sequence
             self._post_sequence += 1
-        self._posts[post.post_id] = deepcopy(post)
+        self._store_post(copy(post))
 
     def list_posts(self) -> Iterable[Post]:
-        return [deepcopy(post) for post in sorted(self._posts.values(), key=lambda p: p.created_at)]
+        return map(copy, [self._posts[post_id] for _, post_id in self._post_order])
 
     def get_post(self, post_id: int) -> Optional[Post]:
         post = self._posts.get(post_id)
         if post is None:
             return None
-        return deepcopy(post)
+        return copy(post)
 
     def save_post(self, post: Post) -> None:
         if post.post_id is None:
             raise ValueError("Post must have an id before saving")
-        self._posts[post.post_id] = deepcopy(post)
+        self._store_post(copy(post))
 
     def list_posts_by_status(self, status: str) -> Iterable[Post]:
-        return [
-            deepcopy(post)
-            for post in sorted(self._posts.values(), key=lambda p: p.created_at)
-            if post.status == status
-        ]
+        entries = self._posts_by_status.get(status, ())
+        return map(copy, [self._posts[post_id] for _, post_id in entries])
 
     def list_posts_for_user(
         self, user_id: int, statuses: Optional[set[str]] | None = None
     ) -> Iterable[Post]:
-        return [
-            deepcopy(post)
-            for post in sorted(self._posts.values(), key=lambda p: p.created_at)
-            if post.user_id == user_id and (statuses is None or post.status in statuses)
-        ]
+        posts = [self._posts[post_id] for _, post_id in self._posts_by_user.get(user_id, ())]
+        if statuses is not None:
+            posts = [post for post in posts if post.status in statuses]
+        return map(copy, posts)
 
     def save_invoice(self, invoice: Invoice) -> None:
-        self._invoices[invoice.invoice_id] = deepcopy(invoice)
+        self._store_invoice(copy(invoice))
 
     def get_invoice(self, invoice_id: int) -> Optional[Invoice]:
         invoice = self._invoices.get(invoice_id)
         if invoice is None:
             return None
-        return deepcopy(invoice)
+        return copy(invoice)
 
     def list_invoices_for_user(self, user_id: int) -> Iterable[Invoice]:
-        return [
-            deepcopy(invoice)
-            for invoice in self._invoices.values()
-            if invoice.user_id == user_id
-        ]
+        entries = self._invoices_by_user.get(user_id, ())
+        return map(copy, [self._invoices[invoice_id] for _, invoice_id in entries])
 
     def list_invoices(self) -> Iterable[Invoice]:
-        return [deepcopy(invoice) for invoice in self._invoices.values()]
+        return map(copy, list(self._invoices.values()))
 
     def save_settings(self, settings: BotSettings) -> None:
-        self._settings = deepcopy(settings)
+        self._settings = settings
 
     def get_settings(self) -> BotSettings:
-        return deepcopy(self._settings)
+        return self._settings
 
     def count_users(self) -> int:
         return len(self._users)
@@ -544,7 +811,7 @@ class InMemoryStorage(AbstractStorage):
     def count_posts(self, status: Optional[str] = None) -> int:
         if status is None:
             return len(self._posts)
-        return sum(1 for post in self._posts.values() if post.status == status)
+        return len(self._posts_by_status.get(status, ()))
 
     def create_ticket(self, user_id: int, initial_message: str) -> Ticket:
         ticket_id = self._ticket_sequence
@@ -561,40 +828,36 @@ class InMemoryStorage(AbstractStorage):
         if ticket.subject is None:
             preview = initial_message.strip()
             ticket.subject = preview[:80] if preview else None
-        self._tickets[ticket_id] = deepcopy(ticket)
-        return deepcopy(ticket)
+        self._store_ticket(ticket)
+        return copy(ticket)
 
     def get_ticket(self, ticket_id: int) -> Optional[Ticket]:
         ticket = self._tickets.get(ticket_id)
         if ticket is None:
             return None
-        return deepcopy(ticket)
+        return copy(ticket)
 
     def save_ticket(self, ticket: Ticket) -> None:
-        self._tickets[ticket.ticket_id] = deepcopy(ticket)
+        self._store_ticket(copy(ticket))
 
     def list_tickets(self, status: Optional[str] = None) -> Iterable[Ticket]:
-        tickets = list(self._tickets.values())
-        if status is not None:
-            tickets = [ticket for ticket in tickets if ticket.status == status]
-        tickets.sort(key=lambda t: t.updated_at, reverse=True)
-        return [deepcopy(ticket) for ticket in tickets]
+        if status is None:
+            entries = self._ticket_order
+        else:
+            entries = self._tickets_by_status.get(status, [])
+        return map(copy, [self._tickets[ticket_id] for _, ticket_id in reversed(entries)])
 
     def list_tickets_for_user(self, user_id: int) -> Iterable[Ticket]:
-        tickets = [
-            ticket
-            for ticket in self._tickets.values()
-            if ticket.user_id == user_id
-        ]
-        tickets.sort(key=lambda t: t.updated_at, reverse=True)
-        return [deepcopy(ticket) for ticket in tickets]
+        entries = self._tickets_by_user.get(user_id, [])
+        return map(copy, [self._tickets[ticket_id] for _, ticket_id in reversed(entries)])
 
     def add_ticket_message(
         self, ticket_id: int, sender: str, text: str
     ) -> Optional[Ticket]:
-        ticket = self._tickets.get(ticket_id)
-        if ticket is None:
+        stored = self._tickets.get(ticket_id)
+        if stored is None:
             return None
+        ticket = copy(stored)
         message = TicketMessage(
             message_id=self._ticket_message_sequence,
             ticket_id=ticket_id,
@@ -606,8 +869,34 @@ class InMemoryStorage(AbstractStorage):
         if sender == "user" and not ticket.subject:
             preview = text.strip()
             ticket.subject = preview[:80] if preview else None
-        self._tickets[ticket_id] = deepcopy(ticket)
-        return deepcopy(ticket)
+        self._store_ticket(ticket)
+        return copy(ticket)
+
+    def bulk_add_messages(
+        self, ticket_id: int, messages: Iterable[tuple[str, str]]
+    ) -> Optional[Ticket]:
+        """Append ``(sender, text)`` pairs to a ticket with a single store."""
+
+        stored = self._tickets.get(ticket_id)
+        if stored is None:
+            return None
+        first_id = self._ticket_message_sequence
+        new_messages = [
+            TicketMessage(
+                message_id=first_id + offset,
+                ticket_id=ticket_id,
+                sender=sender,
+                text=text,
+            )
+            for offset, (sender, text) in enumerate(messages)
+        ]
+        if not new_messages:
+            return copy(stored)
+        self._ticket_message_sequence += len(new_messages)
+        ticket = copy(stored)
+        ticket.add_messages(new_messages)
+        self._store_ticket(ticket)
+        return copy(ticket)
 
     def add_chimera_record(self, record: ChimeraRecord) -> None:
         if record.record_id is None:
@@ -627,198 +916,603 @@ class InMemoryStorage(AbstractStorage):
         return deepcopy(record)
 
     def list_chimera_records(self) -> Iterable[ChimeraRecord]:
-        return [
-            deepcopy(record)
-            for record in sorted(
-                self._chimera_records.values(), key=lambda rec: rec.created_at
-            )
-        ]
+        return map(deepcopy, sorted(self._chimera_records.values(), key=_CREATED_AT_KEY))
 
+    def flush(self) -> None:
+        return None
 
-class JsonStorage(InMemoryStorage):
-    """JSON-backed storage persisted on disk."""
 
-    def __init__(self, path: str | Path) -> None:
+class JsonStorage(InMemoryStorage):
+    """JSON-backed storage persisted on disk.
+
+    The state lives in a snapshot file plus an append-only journal next to
+    it (``<path>.log``). Each flush appends one JSON line holding only the
+    records changed since the previous flush; loading replays the journal
+    on top of the snapshot. The journal is folded back into the snapshot
+    by the first flush after it was replayed, after ``compact_threshold``
+    appended batches and once the journal grows past ``compact_ratio`` times
+    the size of the snapshot.
+
+    Mutations made while an asyncio event loop is running are coalesced:
+    pending changes are flushed once, ``flush_delay`` seconds after the
+    first one, and encoded and written on a single background writer
+    thread so the loop is not blocked by serialization or ``fsync``.
+    Without a running loop every change is flushed immediately. Call
+    :meth:`flush` (or await :meth:`persist_async`) before shutting the loop
+    down; anything still pending is written by :meth:`close` at exit.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        flush_delay: float = DEFAULT_FLUSH_DELAY_SECONDS,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+        compact_ratio: float = DEFAULT_COMPACT_RATIO,
+    ) -> None:
         self._path = Path(path)
         self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._journal_path = self._path.with_suffix(self._path.suffix + ".log")
+        self._temp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        self._flush_delay = flush_delay
+        self._compact_threshold = compact_threshold
+        self._compact_ratio = compact_ratio
+        self._pending: set[tuple[str, int | None]] = set()
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_loop: asyncio.AbstractEventLoop | None = None
+        self._batch_depth = 0
+        self._journal_batches = 0
+        self._journal_size = 0
+        self._snapshot_size = 0
+        self._journaled_sequences: dict[str, int] = {}
+        self._has_snapshot = False
+        # Set when the journal does not end with a newline, so the next
+        # appended line is not glued onto the previous one.
+        self._journal_unterminated = False
+        # Length of the readable part of a journal whose replay stopped at a
+        # bad line; the rest is set aside before the next write.
+        self._torn_journal_offset: int | None = None
+        self._writer: ThreadPoolExecutor | None = None
+        # Guards the pending set and the journal/snapshot bookkeeping, which
+        # the writer thread updates once a write finishes.
+        self._write_lock = threading.Lock()
+        # Encoded JSON of the records journaled since the last snapshot, so
+        # the next compaction can reuse it; cleared whenever a snapshot is
+        # written, which bounds it by the compaction thresholds. Owned by
+        # whichever thread runs _write. Stored records are replaced rather
+        # than mutated, so an identity match means the bytes are still current.
+        self._encoded_records: dict[str, dict[int, tuple[object, bytes]]] = {
+            section: {} for section in _SECTION_SERIALIZERS
+        }
         super().__init__()
         self._load()
+        _OPEN_STORAGES.add(self)
 
     # Persistence helpers -------------------------------------------------
 
-    def _persist(self) -> None:
-        payload = {
-            "users": {str(user_id): _serialize_user(user) for user_id, user in self._users.items()},
-            "posts": {str(post_id): _serialize_post(post) for post_id, post in self._posts.items()},
+    def _persist(self, section: str, key: int | None = None) -> None:
+        self._pending.add((section, key))
+        if not self._batch_depth:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._flush_handle is not None:
+            if loop is self._flush_loop:
+                return
+            # The timer belongs to a loop that has stopped or closed since,
+            # so it may never fire.
+            self._cancel_flush_timer()
+        if loop is None:
+            self.flush()
+            return
+        self._flush_handle = loop.call_later(self._flush_delay, self._flush_if_dirty)
+        self._flush_loop = loop
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Defer writing until the block exits, then flush all changes at once.
+
+        Blocks may be nested; only the outermost one triggers the flush.
+        """
+
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._pending:
+                self._schedule_flush()
+
+    def _flush_if_dirty(self) -> None:
+        self._flush_handle = None
+        self._flush_loop = None
+        if self._pending:
+            self._submit_writes(self._prepare_writes(self._needs_compaction()))
+
+    def _cancel_flush_timer(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+            self._flush_loop = None
+
+    def flush(self) -> None:
+        """Write pending changes to disk right away.
+
+        Blocks until writes already handed to the writer thread are done.
+        """
+
+        self._cancel_flush_timer()
+        if self._pending:
+            self._run_writes(self._prepare_writes(self._needs_compaction()))
+
+    def close(self) -> None:
+        """Wait for background writes, then write the remaining changes.
+
+        Called from an :mod:`atexit` hook, so a pending debounced flush is not
+        lost when the process exits without calling :meth:`flush`.
+        """
+
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        self.flush()
+
+    async def persist_async(self) -> None:
+        """Write pending changes on the writer thread and wait for them.
+
+        Also waits for writes a debounced flush has already handed over.
+        """
+
+        self._cancel_flush_timer()
+        futures: list[Future] = []
+        if self._pending:
+            futures = self._submit_writes(
+                self._prepare_writes(self._needs_compaction())
+            )
+        if not futures and self._writer is not None:
+            # The writer runs jobs in order, so an empty job finishes only
+            # after every write queued before it.
+            futures = [self._writer.submit(_noop)]
+        await asyncio.gather(*map(asyncio.wrap_future, futures))
+
+    def reset(self) -> None:
+        """Drop every record and replace the stored data with an empty snapshot."""
+
+        self._cancel_flush_timer()
+        if self._writer is not None:
+            # Let queued writes settle first so a failed one cannot re-queue
+            # records that no longer exist.
+            self._writer.submit(_noop).result()
+        with self._write_lock:
+            self._pending.clear()
+        for cache in self._encoded_records.values():
+            cache.clear()
+        super().reset()
+        self.compact()
+
+    def compact(self) -> None:
+        """Fold the journal into a fresh snapshot and truncate it."""
+
+        self._cancel_flush_timer()
+        self._run_writes(self._prepare_writes(compact=True))
+
+    def _sequence_state(self) -> dict[str, int]:
+        return {
             "post_sequence": self._post_sequence,
-            "invoices": {
-                str(invoice_id): _serialize_invoice(invoice)
-                for invoice_id, invoice in self._invoices.items()
-            },
-            "tickets": {
-                str(ticket_id): _serialize_ticket(ticket)
-                for ticket_id, ticket in self._tickets.items()
-            },
-            "settings": _serialize_settings(self._settings),
             "ticket_sequence": self._ticket_sequence,
             "ticket_message_sequence": self._ticket_message_sequence,
-            "chimera_records": {
-                str(record_id): _serialize_chimera_record(record)
-                for record_id, record in self._chimera_records.items()
-            },
             "chimera_sequence": self._chimera_sequence,
         }
-        temp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+
+    def _needs_compaction(self) -> bool:
+        return (
+            not self._has_snapshot
+            or self._journal_batches >= self._compact_threshold
+            or self._journal_size > self._snapshot_size * self._compact_ratio
+        )
+
+    def _prepare_writes(self, compact: bool) -> list[_WriteJob]:
+        """Capture the records to write without serializing them.
+
+        Stored records are replaced rather than mutated, so holding on to
+        the current objects is enough for the writer thread to encode a
+        consistent view later.
+        """
+
+        with self._write_lock:
+            return self._prepare_writes_locked(compact)
+
+    def _prepare_writes_locked(self, compact: bool) -> list[_WriteJob]:
+        jobs: list[_WriteJob] = []
+        sequences = self._sequence_state()
+        if self._pending and self._has_snapshot:
+            # When compacting, journal the pending changes first so that
+            # replaying a journal left behind by a crash before it is
+            # truncated cannot roll records back to older versions.
+            pending, self._pending = self._pending, set()
+            sections: dict = {}
+            for section, key in pending:
+                if section == "settings":
+                    sections["settings"] = self._settings
+                    continue
+                records = getattr(self, _SECTION_ATTRIBUTES[section])
+                sections.setdefault(section, {})[key] = records[key]
+            if sequences != self._journaled_sequences:
+                sections.update(sequences)
+            jobs.append(_WriteJob(False, sections, sequences, pending))
+        if compact:
+            self._pending.clear()
+            sections = {
+                section: dict(getattr(self, attribute))
+                for section, attribute in _SECTION_ATTRIBUTES.items()
+            }
+            sections["settings"] = self._settings
+            sections.update(sequences)
+            jobs.append(_WriteJob(True, sections, sequences))
+        return jobs
+
+    def _run_writes(self, jobs: list[_WriteJob]) -> None:
+        for job in jobs:
+            if self._writer is None:
+                self._write_and_record(job)
+            else:
+                # Queue behind background writes so the file sees them in order.
+                self._writer.submit(self._write_and_record, job).result()
+
+    def _submit_writes(self, jobs: list[_WriteJob]) -> list[Future]:
+        if not jobs:
+            return []
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="storage-writer"
+            )
+        futures = []
+        for job in jobs:
+            future = self._writer.submit(self._write_and_record, job)
+            future.add_done_callback(_log_write_failure)
+            futures.append(future)
+        return futures
+
+    def _write_and_record(self, job: _WriteJob) -> int | None:
+        """Write ``job`` and update the bookkeeping on the same thread.
+
+        Recording the outcome here rather than in a loop callback keeps it
+        from being lost when the loop exits before the write finishes.
+        """
+
+        written = None
+        try:
+            written = self._write(job)
+        finally:
+            self._finish_write(job, written)
+        return written
+
+    def _finish_write(self, job: _WriteJob, written: int | None) -> None:
+        with self._write_lock:
+            if written is None:
+                self._pending.update(job.pending)
+                return
+            if job.snapshot:
+                self._has_snapshot = True
+                self._journal_batches = 0
+                self._journal_size = 0
+                self._snapshot_size = written
+            else:
+                self._journal_batches += 1
+                self._journal_size += written
+            self._journaled_sequences = job.sequences
+
+    def _write(self, job: _WriteJob) -> int | None:
+        """Encode and write ``job`` on the writer thread.
+
+        Returns the number of bytes written, or ``None`` if the write failed.
+        """
+
+        if self._torn_journal_offset is not None:
+            self._set_aside_torn_journal()
+        if job.snapshot:
+            return self._write_snapshot(job.sections)
+        data = b"".join(_iter_json_chunks(job.sections, self._encode_record)) + b"\n"
+        return len(data) if self._append_journal(data) else None
+
+    def _encode_record(
+        self, section: str, key: int, record: object, *, remember: bool = True
+    ) -> bytes | None:
+        """Return the JSON for ``record``, or ``None`` if it cannot be encoded.
+
+        Snapshots pass ``remember=False`` so they reuse journaled encodings
+        without caching every record.
+
+        A record that cannot be encoded is logged and left out of the write
+        rather than failing it, since retrying would fail the same way.
+        """
+
+        cache = self._encoded_records[section]
+        cached = cache.get(key)
+        if cached is not None and cached[0] is record:
+            return cached[1]
         try:
-            with temp_path.open("w", encoding="utf-8") as handle:
-                json.dump(payload, handle, ensure_ascii=False, indent=2)
-            temp_path.replace(self._path)
+            data = _dumps(_SECTION_SERIALIZERS[section](record))
+        except (TypeError, ValueError) as exc:
+            LOGGER.error(
+                "Skipping %s record %s that cannot be encoded: %s", section, key, exc
+            )
+            return None
+        if remember:
+            cache[key] = (record, data)
+        return data
+
+    def _append_journal(self, data: bytes) -> bool:
+        # Each line is already one bytes object, so skip the buffered file
+        # layer and hand it to the kernel directly.
+        if self._journal_unterminated:
+            data = b"\n" + data
+        try:
+            fd = os.open(self._journal_path, _JOURNAL_OPEN_FLAGS, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view) :]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError as exc:
+            LOGGER.error("Failed to append to journal %s: %s", self._journal_path, exc)
+            return False
+        self._journal_unterminated = False
+        return True
+
+    def _write_snapshot(self, sections: dict) -> int | None:
+        temp_path = self._temp_path
+        size = 0
+        encode_record = functools.partial(self._encode_record, remember=False)
+        try:
+            with temp_path.open("wb") as handle:
+                for chunk in _iter_json_chunks(sections, encode_record):
+                    size += handle.write(chunk)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temp_path, self._path)
         except OSError as exc:
             LOGGER.error("Failed to write storage file %s: %s", self._path, exc)
             with contextlib.suppress(OSError):
                 temp_path.unlink(missing_ok=True)
+            return None
+        for cache in self._encoded_records.values():
+            cache.clear()
+        _fsync_directory(self._path.parent)
+        try:
+            self._journal_path.unlink(missing_ok=True)
+        except OSError as exc:
+            LOGGER.error("Failed to truncate journal %s: %s", self._journal_path, exc)
+        else:
+            self._journal_unterminated = False
+        return size
 
     def _load(self) -> None:
-        if not self._path.exists():
-            return
+        if self._path.exists():
+            try:
+                data = self._path.read_bytes()
+                snapshot_size = len(data)
+                payload = _loads(data)
+                # Free the raw bytes before converting the parsed payload.
+                del data
+            except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                LOGGER.error("Failed to parse storage file %s: %s", self._path, exc)
+                return
+            except OSError as exc:
+                LOGGER.error("Failed to read storage file %s: %s", self._path, exc)
+                return
+            try:
+                self._apply_payload(payload)
+            except Exception as exc:  # pragma: no cover - defensive logging
+                LOGGER.error("Failed to load storage data from %s: %s", self._path, exc)
+                # Revert to clean in-memory state on error
+                super().__init__()
+                return
+            self._has_snapshot = True
+            self._snapshot_size = snapshot_size
+
+        replayed = self._replay_journal()
+        self._settle_sequences()
+        self._rebuild_indexes()
+        self._journaled_sequences = self._sequence_state()
+        if replayed or self._torn_journal_offset is not None:
+            # Loading must not write: another instance may own these files.
+            # Count the journal as full so the first flush folds it in.
+            self._journal_batches = max(replayed, self._compact_threshold)
+
+    def _replay_journal(self) -> int:
         try:
-            with self._path.open("r", encoding="utf-8") as handle:
-                payload = json.load(handle)
-        except json.JSONDecodeError as exc:
-            LOGGER.error("Failed to parse storage file %s: %s", self._path, exc)
-            return
+            data = self._journal_path.read_bytes()
+        except FileNotFoundError:
+            return 0
         except OSError as exc:
-            LOGGER.error("Failed to read storage file %s: %s", self._path, exc)
-            return
-
+            LOGGER.error("Failed to read journal %s: %s", self._journal_path, exc)
+            return 0
+        replayed = 0
+        offset = 0
+        for line_number, line in enumerate(data.splitlines(keepends=True), start=1):
+            if line.strip():
+                try:
+                    payload = _loads(line)
+                    self._apply_payload(payload)
+                except Exception as exc:
+                    # A torn trailing write is expected after a crash; everything
+                    # before it has already been applied.
+                    LOGGER.warning(
+                        "Stopping journal replay at %s line %s: %s",
+                        self._journal_path,
+                        line_number,
+                        exc,
+                    )
+                    self._torn_journal_offset = offset
+                    break
+                replayed += 1
+            offset += len(line)
+        self._journal_size = offset
+        self._journal_unterminated = offset > 0 and data[offset - 1 : offset] != b"\n"
+        return replayed
+
+    def _set_aside_torn_journal(self) -> None:
+        """Cut the journal back to the last line replay could read.
+
+        Runs before this instance's first write rather than on load, since
+        a second instance may open files another one is still appending to.
+        The whole journal is copied to a new ``<path>.log.corrupt-<time>``
+        file first, so lines after the unreadable one can still be
+        recovered by hand.
+        """
+
+        offset, self._torn_journal_offset = self._torn_journal_offset, None
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        corrupt_path = self._journal_path.with_name(
+            f"{self._journal_path.name}.corrupt-{stamp}"
+        )
         try:
-            raw_users = payload.get("users", {}) or {}
-            self._users = {
-                int(user_id): _deserialize_user({"user_id": user_id, **user_payload})
-                for user_id, user_payload in raw_users.items()
-            }
+            with corrupt_path.open("xb") as handle:
+                handle.write(self._journal_path.read_bytes())
+            os.truncate(self._journal_path, offset)
+        except OSError as exc:
+            LOGGER.error("Failed to truncate journal %s: %s", self._journal_path, exc)
 
-            raw_posts = payload.get("posts", {}) or {}
-            self._posts = {
-                int(post_id): _deserialize_post({"post_id": int(post_id), **post_payload})
-                for post_id, post_payload in raw_posts.items()
-            }
+    def _apply_payload(self, payload: dict) -> None:
+        """Upsert every record present in ``payload`` into the store.
 
-            raw_invoices = payload.get("invoices", {}) or {}
-            self._invoices = {
-                int(invoice_id): _deserialize_invoice(
-                    {"invoice_id": invoice_id, **invoice_payload}
-                )
-                for invoice_id, invoice_payload in raw_invoices.items()
-            }
+        Record sections are popped from ``payload`` as they are consumed so
+        each parsed section can be freed before the next one is converted,
+        instead of keeping the whole parsed tree alive until the end.
+        """
 
-            raw_tickets = payload.get("tickets", {}) or {}
-            self._tickets = {
-                int(ticket_id): _deserialize_ticket(
-                    {"ticket_id": ticket_id, **ticket_payload}
-                )
-                for ticket_id, ticket_payload in raw_tickets.items()
-            }
+        for raw_id, user_payload in (payload.pop("users", None) or {}).items():
+            user_id = int(raw_id)
+            self._users[user_id] = _deserialize_user(user_payload, user_id)
 
-            raw_chimera = payload.get("chimera_records", {}) or {}
-            self._chimera_records = {
-                int(record_id): _deserialize_chimera_record(
-                    {"record_id": int(record_id), **record_payload}
-                )
-                for record_id, record_payload in raw_chimera.items()
-            }
+        for raw_id, post_payload in (payload.pop("posts", None) or {}).items():
+            post_id = int(raw_id)
+            self._posts[post_id] = _deserialize_post(post_payload, post_id)
 
-            stored_sequence = payload.get("post_sequence")
-            if isinstance(stored_sequence, int) and stored_sequence > 0:
-                self._post_sequence = stored_sequence
-            else:
-                self._post_sequence = (
-                    max(self._posts.keys(), default=0) + 1
-                    if self._posts
-                    else 1
-                )
-
-            ticket_sequence = payload.get("ticket_sequence")
-            if isinstance(ticket_sequence, int) and ticket_sequence > 0:
-                self._ticket_sequence = ticket_sequence
-            else:
-                self._ticket_sequence = (
-                    max(self._tickets.keys(), default=0) + 1
-                    if self._tickets
-                    else 1
-                )
-
-            message_sequence = payload.get("ticket_message_sequence")
-            if isinstance(message_sequence, int) and message_sequence > 0:
-                self._ticket_message_sequence = message_sequence
-            else:
-                self._ticket_message_sequence = (
-                    max(
-                        (message.message_id for ticket in self._tickets.values() for message in ticket.messages),
-                        default=0,
-                    )
-                    + 1
-                )
+        for raw_id, invoice_payload in (payload.pop("invoices", None) or {}).items():
+            invoice_id = int(raw_id)
+            self._invoices[invoice_id] = _deserialize_invoice(invoice_payload, invoice_id)
 
-            chimera_sequence = payload.get("chimera_sequence")
-            if isinstance(chimera_sequence, int) and chimera_sequence > 0:
-                self._chimera_sequence = chimera_sequence
-            else:
-                self._chimera_sequence = (
-                    max(self._chimera_records.keys(), default=0) + 1
-                    if self._chimera_records
-                    else 1
-                )
+        for raw_id, ticket_payload in (payload.pop("tickets", None) or {}).items():
+            ticket_id = int(raw_id)
+            self._tickets[ticket_id] = _deserialize_ticket(ticket_payload, ticket_id)
+
+        for raw_id, record_payload in (payload.pop("chimera_records", None) or {}).items():
+            record_id = int(raw_id)
+            self._chimera_records[record_id] = _deserialize_chimera_record(
+                record_payload, record_id
+            )
 
+        for name in (
+            "post_sequence",
+            "ticket_sequence",
+            "ticket_message_sequence",
+            "chimera_sequence",
+        ):
+            value = payload.get(name)
+            if isinstance(value, int) and value > 0:
+                setattr(self, f"_{name}", value)
+
+        if "settings" in payload:
             self._settings = _deserialize_settings(payload.get("settings"))
-        except Exception as exc:  # pragma: no cover - defensive logging
-            LOGGER.error("Failed to load storage data from %s: %s", self._path, exc)
-            # Revert to clean in-memory state on error
-            super().__init__()
+
+    def _settle_sequences(self) -> None:
+        """Make sure sequences never hand out an id that is already taken."""
+
+        self._post_sequence = max(self._post_sequence, max(self._posts, default=0) + 1)
+        self._ticket_sequence = max(
+            self._ticket_sequence, max(self._tickets, default=0) + 1
+        )
+        self._ticket_message_sequence = max(
+            self._ticket_message_sequence,
+            max(
+                (
+                    message.message_id
+                    for ticket in self._tickets.values()
+                    for message in ticket.messages
+                ),
+                default=0,
+            )
+            + 1,
+        )
+        self._chimera_sequence = max(
+            self._chimera_sequence, max(self._chimera_records, default=0) + 1
+        )
 
     # AbstractStorage implementation -------------------------------------
+    #
+    # Saving a record equal to the stored one is a no-op, so idempotent
+    # saves do not queue a write.
 
     def save_user(self, user: User) -> None:
+        if self._users.get(user.user_id) == user:
+            return
         super().save_user(user)
-        self._persist()
+        self._persist("users", user.user_id)
 
     def add_post(self, post: Post) -> None:
         super().add_post(post)
-        self._persist()
+        self._persist("posts", post.post_id)
 
     def save_post(self, post: Post) -> None:
+        if self._posts.get(post.post_id) == post:
+            return
         super().save_post(post)
-        self._persist()
+        self._persist("posts", post.post_id)
 
     def save_invoice(self, invoice: Invoice) -> None:
+        if self._invoices.get(invoice.invoice_id) == invoice:
+            return
         super().save_invoice(invoice)
-        self._persist()
+        self._persist("invoices", invoice.invoice_id)
 
     def save_settings(self, settings: BotSettings) -> None:
+        if settings == self._settings:
+            return
         super().save_settings(settings)
-        self._persist()
+        self._persist("settings")
 
     def create_ticket(self, user_id: int, initial_message: str) -> Ticket:
         ticket = super().create_ticket(user_id, initial_message)
-        self._persist()
+        self._persist("tickets", ticket.ticket_id)
         return ticket
 
     def save_ticket(self, ticket: Ticket) -> None:
+        if self._tickets.get(ticket.ticket_id) == ticket:
+            return
         super().save_ticket(ticket)
-        self._persist()
+        self._persist("tickets", ticket.ticket_id)
 
     def add_ticket_message(
         self, ticket_id: int, sender: str, text: str
     ) -> Optional[Ticket]:
         ticket = super().add_ticket_message(ticket_id, sender, text)
         if ticket is not None:
-            self._persist()
+            self._persist("tickets", ticket_id)
+        return ticket
+
+    def bulk_add_messages(
+        self, ticket_id: int, messages: Iterable[tuple[str, str]]
+    ) -> Optional[Ticket]:
+        messages = list(messages)
+        ticket = super().bulk_add_messages(ticket_id, messages)
+        if ticket is not None and messages:
+            self._persist("tickets", ticket_id)
         return ticket
 
     def add_chimera_record(self, record: ChimeraRecord) -> None:
         super().add_chimera_record(record)
-        self._persist()
+        self._persist("chimera_records", record.record_id)
 
     def save_chimera_record(self, record: ChimeraRecord) -> None:
+        if self._chimera_records.get(record.record_id) == record:
+            return
         super().save_chimera_record(record)
-        self._persist()
+        self._persist("chimera_records", record.record_id)
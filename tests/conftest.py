@@ -9,3 +9,10 @@ from pathlib import Path
 PROJECT_SRC = Path(__file__).resolve().parents[1] / "src"
 if str(PROJECT_SRC) not in sys.path:
     sys.path.insert(0, str(PROJECT_SRC))
+
+
+def pytest_configure(config) -> None:
+    # Registered here so the marks do not warn when pytest-xdist is absent.
+    config.addinivalue_line(
+        "markers", "xdist_group(name): run the marked tests on the same xdist worker"
+    )
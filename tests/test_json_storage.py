@@ -2,7 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import shutil
+import threading
+import weakref
 from datetime import timedelta
+from pathlib import Path
+
+import pytest
 
 from channel_admin.models import (
     BotSettings,
@@ -14,47 +21,58 @@ from channel_admin.models import (
     UserboxProfile,
     utcnow,
 )
+from channel_admin import storage as storage_module
 from channel_admin.storage import JsonStorage
 
 
-def test_json_storage_persists_between_sessions(tmp_path) -> None:
-    db_path = tmp_path / "storage.json"
+@pytest.fixture(scope="module")
+def populated_storage_path(tmp_path_factory) -> Path:
+    """Write a storage file covering every record type once per module."""
 
+    db_path = tmp_path_factory.mktemp("populated") / "storage.json"
     storage = JsonStorage(db_path)
 
-    user = User(user_id=1, energy=5, is_admin=True)
-    user.referred_users.add(2)
-    user.add_golden_card(GoldenCard(duration=timedelta(hours=12)))
-    storage.save_user(user)
+    with storage.batch():
+        user = User(user_id=1, energy=5, is_admin=True)
+        user.referred_users.add(2)
+        user.add_golden_card(GoldenCard(duration=timedelta(hours=12)))
+        storage.save_user(user)
 
-    post = Post(user_id=1, text="Hello")
-    storage.add_post(post)
-    post.status = "approved"
-    storage.save_post(post)
-
-    invoice = Invoice(
-        invoice_id=100,
-        user_id=1,
-        invoice_type="energy",
-        amount=50.0,
-        asset="USDT",
-        pay_url="https://example.com",
-        price=5.0,
-        status="paid",
-        paid_at=utcnow(),
-        energy_amount=100,
-    )
-    storage.save_invoice(invoice)
+        post = Post(user_id=1, text="Hello")
+        storage.add_post(post)
+        post.status = "approved"
+        storage.save_post(post)
+
+        storage.save_invoice(
+            Invoice(
+                invoice_id=100,
+                user_id=1,
+                invoice_type="energy",
+                amount=50.0,
+                asset="USDT",
+                pay_url="https://example.com",
+                price=5.0,
+                status="paid",
+                paid_at=utcnow(),
+                energy_amount=100,
+            )
+        )
 
-    settings = BotSettings(autopost_paused=True, post_energy_cost=40, energy_price_per_unit=1.5)
-    storage.save_settings(settings)
+        storage.save_settings(
+            BotSettings(autopost_paused=True, post_energy_cost=40, energy_price_per_unit=1.5)
+        )
 
-    ticket = storage.create_ticket(1, "Помогите")
-    ticket = storage.add_ticket_message(ticket.ticket_id, "admin", "Уточните детали") or ticket
-    ticket.status = "closed"
-    storage.save_ticket(ticket)
+        ticket = storage.create_ticket(1, "Помогите")
+        ticket = storage.add_ticket_message(ticket.ticket_id, "admin", "Уточните детали") or ticket
+        ticket.status = "closed"
+        storage.save_ticket(ticket)
 
-    assert db_path.exists()
+    return db_path
+
+
+def test_json_storage_persists_between_sessions(populated_storage_path, tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    shutil.copyfile(populated_storage_path, db_path)
 
     fresh_storage = JsonStorage(db_path)
 
@@ -65,11 +83,11 @@ def test_json_storage_persists_between_sessions(tmp_path) -> None:
     assert 2 in loaded_user.referred_users
     assert len(loaded_user.golden_cards) == 1
 
-    loaded_post = fresh_storage.get_post(post.post_id)
+    loaded_post = fresh_storage.get_post(1)
     assert loaded_post is not None
     assert loaded_post.status == "approved"
 
-    loaded_invoice = fresh_storage.get_invoice(invoice.invoice_id)
+    loaded_invoice = fresh_storage.get_invoice(100)
     assert loaded_invoice is not None
     assert loaded_invoice.status == "paid"
     assert loaded_invoice.paid_at is not None
@@ -80,14 +98,32 @@ def test_json_storage_persists_between_sessions(tmp_path) -> None:
     assert loaded_settings.post_energy_cost == 40
     assert loaded_settings.energy_price_per_unit == 1.5
 
-    loaded_ticket = fresh_storage.get_ticket(ticket.ticket_id)
+    loaded_ticket = fresh_storage.get_ticket(1)
     assert loaded_ticket is not None
     assert loaded_ticket.status == "closed"
     assert len(loaded_ticket.messages) == 2
 
     new_post = Post(user_id=1, text="Another")
     fresh_storage.add_post(new_post)
-    assert new_post.post_id == (post.post_id or 0) + 1
+    assert new_post.post_id == 2
+
+
+def test_json_storage_batch_writes_once(populated_storage_path, tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    journal_path = tmp_path / "storage.json.log"
+    shutil.copyfile(populated_storage_path, db_path)
+    storage = JsonStorage(db_path)
+
+    with storage.batch():
+        storage.save_user(User(user_id=1, energy=6))
+        with storage.batch():
+            storage.save_user(User(user_id=2, energy=7))
+        assert not journal_path.exists()
+
+    assert len(journal_path.read_bytes().splitlines()) == 1
+    reloaded = JsonStorage(db_path)
+    assert reloaded.get_user(1).energy == 6
+    assert reloaded.get_user(2).energy == 7
 
 
 def test_json_storage_persists_chimera_records(tmp_path) -> None:
@@ -99,7 +135,7 @@ def test_json_storage_persists_chimera_records(tmp_path) -> None:
     record.userbox_profile = UserboxProfile(
         full_name="Иван Иванов",
         birth_date="01.01.1990",
-        phone_numbers=["+79990001122", " "],
+        phone_numbers=("+79990001122", " "),
         address="Москва",
     )
     storage.save_chimera_record(record)
@@ -112,4 +148,365 @@ def test_json_storage_persists_chimera_records(tmp_path) -> None:
     assert loaded.address_query == "Москва, ул. Пушкина"
     assert loaded.userbox_profile is not None
     assert loaded.userbox_profile.full_name == "Иван Иванов"
-    assert loaded.userbox_profile.phone_numbers == ["+79990001122"]
+    assert loaded.userbox_profile.phone_numbers == ("+79990001122",)
+
+
+def test_json_storage_fallback_encoder_matches_orjson(tmp_path, monkeypatch) -> None:
+    db_path = tmp_path / "storage.json"
+    created_at = utcnow()
+    monkeypatch.setattr(storage_module, "orjson", None)
+
+    storage = JsonStorage(db_path)
+    storage.add_post(Post(user_id=1, text="hello", created_at=created_at))
+
+    monkeypatch.undo()
+    reloaded = JsonStorage(db_path)
+    posts = list(reloaded.list_posts())
+    assert [post.created_at for post in posts] == [created_at]
+
+
+def test_json_storage_coalesces_writes_inside_event_loop(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    storage = JsonStorage(db_path, flush_delay=0.01)
+
+    async def scenario() -> None:
+        for user_id in range(1, 6):
+            storage.save_user(User(user_id=user_id, energy=user_id))
+        assert not db_path.exists()
+        await asyncio.sleep(0.05)
+        await storage.persist_async()
+
+    asyncio.run(scenario())
+
+    reloaded = JsonStorage(db_path)
+    assert reloaded.count_users() == 5
+
+    async def flush_scenario() -> None:
+        storage.save_user(User(user_id=10))
+        storage.flush()
+
+    asyncio.run(flush_scenario())
+    assert JsonStorage(db_path).get_user(10) is not None
+
+
+def test_json_storage_records_writes_finished_after_loop_exit(
+    tmp_path, monkeypatch
+) -> None:
+    db_path = tmp_path / "storage.json"
+    storage = JsonStorage(db_path, flush_delay=0)
+    release = threading.Event()
+    original_write = JsonStorage._write
+
+    def slow_write(self, job):
+        release.wait()
+        return original_write(self, job)
+
+    monkeypatch.setattr(JsonStorage, "_write", slow_write)
+
+    async def scenario() -> None:
+        storage.save_user(User(user_id=1))
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    release.set()
+    storage.close()
+
+    assert storage._has_snapshot
+    assert JsonStorage(db_path).get_user(1) is not None
+
+
+def test_json_storage_flushes_after_timer_loop_exits(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    storage = JsonStorage(db_path, flush_delay=60)
+
+    async def scenario() -> None:
+        storage.save_user(User(user_id=1))
+
+    asyncio.run(scenario())
+    storage.save_user(User(user_id=2))
+
+    reloaded = JsonStorage(db_path)
+    assert reloaded.get_user(1) is not None
+    assert reloaded.get_user(2) is not None
+
+
+def test_json_storage_persist_async_skips_writes_without_changes(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    storage = JsonStorage(db_path)
+
+    asyncio.run(storage.persist_async())
+    assert not db_path.exists()
+
+    storage.save_user(User(user_id=1))
+    storage.save_user(User(user_id=1, energy=5))
+    snapshot = db_path.read_bytes()
+    reloaded = JsonStorage(db_path)
+    asyncio.run(reloaded.persist_async())
+    assert db_path.read_bytes() == snapshot
+
+
+def test_json_storage_persist_async_writes_on_background_thread(
+    tmp_path, monkeypatch
+) -> None:
+    db_path = tmp_path / "storage.json"
+    storage = JsonStorage(db_path)
+    storage.save_user(User(user_id=1))
+    writer_threads: list[str] = []
+    original_write = JsonStorage._write
+
+    def recording_write(self, job):
+        writer_threads.append(threading.current_thread().name)
+        return original_write(self, job)
+
+    monkeypatch.setattr(JsonStorage, "_write", recording_write)
+
+    async def scenario() -> None:
+        storage.save_user(User(user_id=2, energy=7))
+        await storage.persist_async()
+
+    asyncio.run(scenario())
+
+    assert writer_threads
+    assert all(name.startswith("storage-writer") for name in writer_threads)
+    assert JsonStorage(db_path).get_user(2).energy == 7
+
+
+def test_json_storage_close_writes_pending_changes(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    storage = JsonStorage(db_path, flush_delay=60)
+
+    async def scenario() -> None:
+        storage.save_user(User(user_id=1, energy=3))
+        await storage.persist_async()
+        storage.save_user(User(user_id=1, energy=4))
+
+    asyncio.run(scenario())
+    assert JsonStorage(db_path).get_user(1).energy == 3
+
+    storage.close()
+    assert JsonStorage(db_path).get_user(1).energy == 4
+
+
+def test_json_storage_skips_saving_unchanged_records(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    journal_path = tmp_path / "storage.json.log"
+    storage = JsonStorage(db_path)
+
+    user = User(user_id=1, energy=5)
+    storage.save_user(user)
+    storage.save_user(user)
+    storage.save_settings(storage.get_settings())
+    assert not journal_path.exists()
+
+    user.energy = 6
+    storage.save_user(user)
+    assert len(journal_path.read_bytes().splitlines()) == 1
+
+
+def test_json_storage_reuses_encoded_records_between_writes(
+    tmp_path, monkeypatch
+) -> None:
+    db_path = tmp_path / "storage.json"
+    storage = JsonStorage(db_path)
+    storage.save_user(User(user_id=1, energy=1))
+    storage.save_user(User(user_id=2, energy=2))
+    encoded: list[int] = []
+    serialize_user = storage_module._SECTION_SERIALIZERS["users"]
+
+    def counting_serializer(user):
+        encoded.append(user.user_id)
+        return serialize_user(user)
+
+    monkeypatch.setitem(storage_module._SECTION_SERIALIZERS, "users", counting_serializer)
+
+    storage.save_user(User(user_id=2, energy=3))
+    storage.compact()
+
+    # Only the journaled user is reused; the snapshot drops the cache.
+    assert encoded == [2, 1]
+    assert all(not cache for cache in storage._encoded_records.values())
+    assert JsonStorage(db_path).get_user(2).energy == 3
+
+
+def test_json_storage_rebuilds_lookup_indexes_on_load(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    storage = JsonStorage(db_path)
+
+    first = Post(user_id=1, text="first")
+    second = Post(user_id=2, text="second")
+    storage.add_post(first)
+    storage.add_post(second)
+    first.status = "approved"
+    storage.save_post(first)
+    storage.create_ticket(2, "Вопрос")
+
+    reloaded = JsonStorage(db_path)
+    assert reloaded.count_posts(status="pending") == 1
+    assert reloaded.count_posts(status="approved") == 1
+    assert [post.post_id for post in reloaded.list_posts_by_status("approved")] == [
+        first.post_id
+    ]
+    assert [post.text for post in reloaded.list_posts_for_user(2, {"pending"})] == [
+        "second"
+    ]
+    assert list(reloaded.list_posts_for_user(1, {"pending"})) == []
+    assert len(list(reloaded.list_tickets_for_user(2))) == 1
+    assert len(list(reloaded.list_tickets(status="open"))) == 1
+
+
+def test_json_storage_replays_journal_and_compacts(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    journal_path = tmp_path / "storage.json.log"
+    storage = JsonStorage(db_path)
+
+    storage.save_user(User(user_id=1, energy=10))
+    snapshot = db_path.read_bytes()
+    storage.save_user(User(user_id=1, energy=20))
+    storage.save_user(User(user_id=2, energy=30))
+
+    assert db_path.read_bytes() == snapshot
+    assert len(journal_path.read_bytes().splitlines()) == 2
+
+    with journal_path.open("ab") as handle:
+        handle.write(b'{"users": {"3": {"energy"')
+
+    journal = journal_path.read_bytes()
+    reloaded = JsonStorage(db_path)
+    assert reloaded.get_user(1).energy == 20
+    assert reloaded.get_user(2).energy == 30
+    assert reloaded.get_user(3) is None
+    assert db_path.read_bytes() == snapshot
+    assert journal_path.read_bytes() == journal
+
+    reloaded.save_user(User(user_id=4))
+    assert not journal_path.exists()
+    assert JsonStorage(db_path).get_user(2).energy == 30
+    [corrupt_path] = tmp_path.glob("storage.json.log.corrupt-*")
+    assert corrupt_path.read_bytes() == journal
+
+
+def test_json_storage_recovers_from_torn_first_journal_line(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    journal_path = tmp_path / "storage.json.log"
+    JsonStorage(db_path).save_user(User(user_id=1, energy=1))
+    journal_path.write_bytes(b'{"users": {"1": {"energy"')
+
+    (tmp_path / "storage.json.log.corrupt-earlier").write_bytes(b"earlier")
+
+    storage = JsonStorage(db_path)
+    assert storage.get_user(1).energy == 1
+    assert journal_path.read_bytes() == b'{"users": {"1": {"energy"'
+    storage.save_user(User(user_id=1, energy=2))
+
+    assert JsonStorage(db_path).get_user(1).energy == 2
+    corrupt = {path.name: path.read_bytes() for path in tmp_path.glob("*.corrupt-*")}
+    assert corrupt.pop("storage.json.log.corrupt-earlier") == b"earlier"
+    assert list(corrupt.values()) == [b'{"users": {"1": {"energy"']
+
+
+def test_json_storage_load_does_not_write(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    journal_path = tmp_path / "storage.json.log"
+    storage = JsonStorage(db_path)
+    storage.save_user(User(user_id=1))
+    storage.save_user(User(user_id=1, energy=5))
+    snapshot = db_path.read_bytes()
+    journal = journal_path.read_bytes()
+
+    assert JsonStorage(db_path).get_user(1).energy == 5
+    assert db_path.read_bytes() == snapshot
+    assert journal_path.read_bytes() == journal
+
+
+def test_json_storage_compacts_after_threshold(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    journal_path = tmp_path / "storage.json.log"
+    storage = JsonStorage(db_path, compact_threshold=2)
+
+    for energy in range(4):
+        storage.save_user(User(user_id=1, energy=energy))
+
+    assert not journal_path.exists()
+    assert JsonStorage(db_path).get_user(1).energy == 3
+
+
+def test_json_storage_compacts_when_journal_outgrows_snapshot(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    journal_path = tmp_path / "storage.json.log"
+    storage = JsonStorage(db_path, compact_ratio=1)
+
+    storage.save_user(User(user_id=1))
+    storage.save_user(User(user_id=1, username="a" * 1000))
+    assert journal_path.exists()
+
+    storage.save_user(User(user_id=1, energy=5))
+    assert not journal_path.exists()
+    assert JsonStorage(db_path).get_user(1).energy == 5
+
+
+def test_json_storage_exit_hook_does_not_pin_instances(tmp_path) -> None:
+    storage = JsonStorage(tmp_path / "storage.json")
+    assert storage in storage_module._OPEN_STORAGES
+
+    reference = weakref.ref(storage)
+    del storage
+    assert reference() is None
+
+
+def test_json_storage_reset_clears_stored_data(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    storage = JsonStorage(db_path)
+    storage.save_user(User(user_id=1))
+    storage.save_user(User(user_id=2, energy=5))
+
+    storage.reset()
+    storage.save_user(User(user_id=3))
+
+    reloaded = JsonStorage(db_path)
+    assert reloaded.get_user(1) is None
+    assert reloaded.get_user(2) is None
+    assert reloaded.get_user(3) is not None
+
+
+def test_json_storage_skips_empty_message_batches(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    journal_path = tmp_path / "storage.json.log"
+    storage = JsonStorage(db_path)
+    ticket = storage.create_ticket(1, "Вопрос")
+
+    assert storage.bulk_add_messages(ticket.ticket_id, []) is not None
+    assert not journal_path.exists()
+
+
+def test_json_storage_skips_records_that_cannot_be_encoded(tmp_path) -> None:
+    db_path = tmp_path / "storage.json"
+    storage = JsonStorage(db_path)
+    storage.save_user(User(user_id=1))
+
+    storage.add_chimera_record(ChimeraRecord(address_query="x", raw_results=[{"bad": object()}]))
+    storage.save_user(User(user_id=2))
+    storage.compact()
+
+    reloaded = JsonStorage(db_path)
+    assert reloaded.get_user(2) is not None
+    assert list(reloaded.list_chimera_records()) == []
+
+
+def test_json_storage_exit_hook_closes_every_storage(tmp_path, monkeypatch) -> None:
+    failing = JsonStorage(tmp_path / "failing.json")
+    healthy = JsonStorage(tmp_path / "healthy.json", flush_delay=60)
+
+    def broken_close() -> None:
+        raise RuntimeError("close failed")
+
+    monkeypatch.setattr(failing, "close", broken_close)
+    monkeypatch.setattr(storage_module, "_OPEN_STORAGES", [failing, healthy])
+
+    async def scenario() -> None:
+        healthy.save_user(User(user_id=1))
+
+    asyncio.run(scenario())
+    storage_module._close_open_storages()
+
+    monkeypatch.undo()
+    assert JsonStorage(tmp_path / "healthy.json").get_user(1) is not None
@@ -1,108 +1,190 @@
+import math
 from datetime import timedelta
+from typing import Callable, TypeVar
 
 import pytest
 
 from channel_admin.config import FilterConfig, PricingConfig
-from channel_admin.models import UserboxProfile
+from channel_admin.models import User
 from channel_admin.services import ChannelEconomyService, ChimeraService
 from channel_admin.storage import InMemoryStorage
 
 
-@pytest.fixture()
-def service() -> ChannelEconomyService:
-    pricing = PricingConfig(rubles_per_usd=1.0)
-    service = ChannelEconomyService(
+# Keep each service's tests on one worker under ``pytest -n --dist=loadgroup``
+# so its module-scoped fixture is built once per run; Chimera tests override
+# the group below.
+pytestmark = pytest.mark.xdist_group("economy")
+
+FILTER_CONFIG = FilterConfig(banned_words=frozenset({"запрещено"}))
+ONE_DAY = timedelta(hours=24)
+
+T = TypeVar("T")
+
+
+def _require(value: T | None) -> T:
+    assert value is not None
+    return value
+
+
+@pytest.fixture(scope="module")
+def shared_service() -> ChannelEconomyService:
+    # The service rewrites its PricingConfig whenever settings change, so
+    # the pricing is owned by the service rather than shared at module level.
+    return ChannelEconomyService(
         storage=InMemoryStorage(),
-        pricing=pricing,
-        filter_config=FilterConfig(banned_words={"запрещено"}),
+        pricing=PricingConfig(rubles_per_usd=1.0),
+        filter_config=FILTER_CONFIG,
         registration_energy=100,
         referral_energy=30,
         post_energy_cost=10,
     )
-    service.update_post_price(10)
-    return service
 
 
 @pytest.fixture()
-def chimera_service() -> ChimeraService:
+def service(shared_service: ChannelEconomyService) -> ChannelEconomyService:
+    shared_service.storage.reset()
+    shared_service.update_post_price(10)
+    return shared_service
+
+
+@pytest.fixture()
+def seeded_user(service: ChannelEconomyService) -> Callable[..., User]:
+    """Store a user directly, skipping the purchase flow."""
+
+    def seed(user_id: int = 1, energy: int = 50, **fields: object) -> User:
+        user = User(user_id=user_id, energy=energy, **fields)
+        service.storage.save_user(user)
+        return user
+
+    return seed
+
+
+@pytest.fixture(scope="module")
+def shared_chimera_service() -> ChimeraService:
     return ChimeraService(storage=InMemoryStorage())
 
 
-def test_registration_awards_energy(service: ChannelEconomyService) -> None:
-    user = service.register_user(1, subscribed_to_sponsors=True)
-    assert user.energy == 100
+@pytest.fixture()
+def chimera_service(shared_chimera_service: ChimeraService) -> ChimeraService:
+    shared_chimera_service.storage.reset()
+    return shared_chimera_service
+
+
+def _register(
+    service: ChannelEconomyService, seeded_user: Callable[..., User]
+) -> int:
+    service.register_user(1, subscribed_to_sponsors=True)
+    return service.registration_energy
 
 
-def test_registration_stores_profile(service: ChannelEconomyService) -> None:
+def _submit_unpinned_post(
+    service: ChannelEconomyService, seeded_user: Callable[..., User]
+) -> int:
+    user = seeded_user()
+    post = service.submit_post(1, "Новый пост без фильтра")
+    assert not post.requires_pin
+    return user.energy - service.post_energy_cost
+
+
+def _award_referral_twice(
+    service: ChannelEconomyService, seeded_user: Callable[..., User]
+) -> int:
+    service.award_referral(1, 2)
+    service.award_referral(1, 2)
+    return service.referral_energy
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        pytest.param(_register, id="registration-awards-energy"),
+        pytest.param(_submit_unpinned_post, id="post-spends-energy"),
+        pytest.param(_award_referral_twice, id="referral-awarded-once"),
+    ],
+)
+def test_energy_outcomes(
+    service: ChannelEconomyService,
+    seeded_user: Callable[..., User],
+    action: Callable[[ChannelEconomyService, Callable[..., User]], int],
+) -> None:
+    expected_energy = action(service, seeded_user)
+    assert _require(service.get_user_balance(1)).energy == expected_energy
+
+
+@pytest.mark.parametrize(
+    ("username", "full_name"),
+    [("alice", "Alice Example"), ("alice_new", "Alice Updated")],
+)
+def test_registration_stores_profile(
+    service: ChannelEconomyService, username: str, full_name: str
+) -> None:
     user = service.register_user(
-        1,
-        subscribed_to_sponsors=True,
-        username="alice",
-        full_name="Alice Example",
+        1, subscribed_to_sponsors=True, username=username, full_name=full_name
     )
-    assert user.username == "alice"
-    assert user.full_name == "Alice Example"
+    assert user.username == username
+    assert user.full_name == full_name
+
+
+def test_registration_overwrites_profile(
+    service: ChannelEconomyService, seeded_user: Callable[..., User]
+) -> None:
+    seeded = seeded_user(username="alice", full_name="Alice Example")
 
     updated = service.register_user(
-        1,
-        subscribed_to_sponsors=True,
-        username="alice_new",
-        full_name="Alice Updated",
+        1, subscribed_to_sponsors=True, username="alice_new", full_name="Alice Updated"
     )
     assert updated.username == "alice_new"
     assert updated.full_name == "Alice Updated"
+    assert updated.energy == seeded.energy
 
 
 def test_registration_requires_subscription(service: ChannelEconomyService) -> None:
-    with pytest.raises(ValueError):
+    with pytest.raises(ValueError, match="subscribe to sponsors"):
         service.register_user(1, subscribed_to_sponsors=False)
 
 
 def test_purchase_energy_adds_balance(service: ChannelEconomyService) -> None:
     cost = service.purchase_energy(1, 50)
-    assert pytest.approx(cost, rel=1e-3) == service.pricing.price_for_energy(50)
-    user = service.get_user_balance(1)
-    assert user and user.energy == 50
+    assert math.isclose(cost, service.pricing.price_for_energy(50), rel_tol=1e-3)
+    assert _require(service.get_user_balance(1)).energy == 50
 
 
-def test_filter_blocks_banned_words(service: ChannelEconomyService) -> None:
-    service.purchase_energy(1, 50)
-    with pytest.raises(ValueError):
+def test_filter_blocks_banned_words(
+    service: ChannelEconomyService, seeded_user: Callable[..., User]
+) -> None:
+    seeded_user(energy=50)
+    with pytest.raises(ValueError, match="banned words"):
         service.submit_post(1, "Это запрещено к публикации")
 
 
-def test_post_spends_energy(service: ChannelEconomyService) -> None:
-    service.purchase_energy(1, 50)
-    post = service.submit_post(1, "Новый пост без фильтра")
-    user = service.get_user_balance(1)
-    assert user and user.energy == 40
-    assert not post.requires_pin
-
-
-def test_golden_card_makes_post_pin(service: ChannelEconomyService) -> None:
-    service.purchase_energy(1, 50)
-    service.purchase_golden_card(1, timedelta(hours=24))
+def test_golden_card_makes_post_pin(
+    service: ChannelEconomyService, seeded_user: Callable[..., User]
+) -> None:
+    seeded_user(energy=50)
+    service.purchase_golden_card(1, ONE_DAY)
     post = service.submit_post(1, "Пост с закрепом")
     assert post.requires_pin
 
 
-def test_purchase_golden_card_with_energy(service: ChannelEconomyService) -> None:
-    service.purchase_energy(1, 200)
-    cost = service.energy_cost_for_golden_card(timedelta(hours=24))
+def test_purchase_golden_card_with_energy(
+    service: ChannelEconomyService, seeded_user: Callable[..., User]
+) -> None:
+    seeded_user(energy=200)
+    cost = service.energy_cost_for_golden_card(ONE_DAY)
     assert cost is not None
-    spent = service.purchase_golden_card_with_energy(1, timedelta(hours=24))
+    spent = service.purchase_golden_card_with_energy(1, ONE_DAY)
     assert spent == cost
-    user = service.get_user_balance(1)
-    assert user is not None
+    user = _require(service.get_user_balance(1))
     assert len(user.golden_cards) == 1
     assert user.energy == 200 - cost
 
 
-def test_award_referral_only_once(service: ChannelEconomyService) -> None:
-    service.award_referral(1, 2)
-    service.award_referral(1, 2)
-    user = service.get_user_balance(1)
-    assert user and user.energy == service.referral_energy
+def test_settings_updates_replace_shared_instance(service: ChannelEconomyService) -> None:
+    before = service.get_settings()
+    updated = service.update_post_price(25)
+    assert before.post_energy_cost == 10
+    assert updated.post_energy_cost == 25
+    assert service.get_settings() is updated
 
 
 def test_support_ticket_flow(service: ChannelEconomyService) -> None:
@@ -115,10 +197,13 @@ def test_support_ticket_flow(service: ChannelEconomyService) -> None:
     updated = service.add_ticket_message(ticket.ticket_id, "admin", "Добрый день")
     assert len(updated.messages) == 2
 
+    replies = [("user", "Спасибо"), ("admin", "Рады помочь")]
+    updated = service.add_ticket_messages(ticket.ticket_id, replies)
+    assert len(updated.messages) == 2 + len(replies)
+    assert [message.sender for message in updated.messages[1:]] == ["admin", "user", "admin"]
+
     service.close_ticket(ticket.ticket_id)
-    closed = service.get_ticket(ticket.ticket_id)
-    assert closed is not None
-    assert closed.status == "closed"
+    assert _require(service.get_ticket(ticket.ticket_id)).status == "closed"
 
     reopened = service.reopen_ticket(ticket.ticket_id)
     assert reopened.status == "open"
@@ -128,6 +213,7 @@ def test_support_ticket_flow(service: ChannelEconomyService) -> None:
     assert user_tickets[0].ticket_id == ticket.ticket_id
 
 
+@pytest.mark.xdist_group("chimera")
 def test_chimera_service_records_address_search(
     chimera_service: ChimeraService,
 ) -> None:
@@ -135,36 +221,38 @@ def test_chimera_service_records_address_search(
         "Москва, Тверская 1",
         results=[{"apartment": "42"}, {"floor": 3}],
     )
-    assert record.record_id is not None
-    stored = chimera_service.get_record(record.record_id or 0)
-    assert stored is not None
+    record_id = _require(record.record_id)
+    stored = _require(chimera_service.get_record(record_id))
     assert stored.address_query == "Москва, Тверская 1"
     assert stored.raw_results[0]["apartment"] == "42"
 
     updated = chimera_service.attach_userbox_profile(
-        record.record_id or 0,
+        record_id,
         full_name="Иван Иванов",
         birth_date="01.01.1990",
         phone_numbers=["+79995553322", ""],
         address="Москва",
     )
-    assert updated.userbox_profile == UserboxProfile(
-        full_name="Иван Иванов",
-        birth_date="01.01.1990",
-        phone_numbers=["+79995553322"],
-        address="Москва",
-    )
+    profile = _require(updated.userbox_profile)
+    assert (
+        profile.full_name,
+        profile.birth_date,
+        profile.phone_numbers,
+        profile.address,
+    ) == ("Иван Иванов", "01.01.1990", ("+79995553322",), "Москва")
 
 
+@pytest.mark.xdist_group("chimera")
 def test_chimera_service_requires_address(
     chimera_service: ChimeraService,
 ) -> None:
-    with pytest.raises(ValueError):
+    with pytest.raises(ValueError, match="Адрес должен быть указан"):
         chimera_service.record_address_search("   ")
 
 
+@pytest.mark.xdist_group("chimera")
 def test_chimera_service_missing_record(
     chimera_service: ChimeraService,
 ) -> None:
-    with pytest.raises(KeyError):
+    with pytest.raises(KeyError, match="Chimera record 999 not found"):
         chimera_service.attach_userbox_profile(999, full_name=None, birth_date=None)